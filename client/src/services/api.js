@@ -72,6 +72,11 @@ class ApiService {
     return this.request(`/company/${ticker}/summary`);
   }
 
+  // Get peer percentile ranks for a company, optionally for a single year
+  async getCompanyPeers(ticker, year) {
+    return this.request(year ? `/company/${ticker}/peers?year=${year}` : `/company/${ticker}/peers`);
+  }
+
   // Health check
   async getHealth() {
     return this.request('/health');
@@ -14,6 +14,22 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+def partition_by_ticker(df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray, Dict[str, slice]]:
+    """
+    Sorts rows by ticker and year so each company occupies a contiguous block.
+    Returns the sorted frame, the tickers and a map from ticker to its row range.
+    """
+    df = df.sort_values(by=['Ticker Symbol', 'Year'], kind='stable').reset_index(drop=True)
+    ticker_values = df['Ticker Symbol'].to_numpy()
+    tickers, starts = np.unique(ticker_values, return_index=True)
+    stops = np.append(starts[1:], len(ticker_values))
+    slices = {
+        ticker: slice(int(start), int(stop))
+        for ticker, start, stop in zip(tickers, starts, stops)
+    }
+    return df, tickers, slices
+
+
 # --- Combined Analysis Module ---
 class CompanyAnalyzer:
     """
@@ -31,7 +47,8 @@ class CompanyAnalyzer:
             # --- THIS IS THE NEW FILTERING STEP ---
             # Group by company and filter out those with less than 4 years of data.
             records_before_filter = len(self.df['Ticker Symbol'].unique())
-            self.df = self.df.groupby('Ticker Symbol').filter(lambda x: len(x) >= 4)
+            company_sizes = self.df.groupby('Ticker Symbol')['Ticker Symbol'].transform('size')
+            self.df = self.df[company_sizes >= 4]
             records_after_filter = len(self.df['Ticker Symbol'].unique())
             logger.info(f"Filtered out {records_before_filter - records_after_filter} companies with less than 4 years of data.")
             logger.info(f"Proceeding with analysis for {records_after_filter} companies.")
@@ -46,22 +63,40 @@ class CompanyAnalyzer:
         self.features_for_history = [
             'Total Revenue', 'Net Income', 'Total Assets', 'Earnings Per Share'
         ]
+        self._build_panel()
+
+    def _build_panel(self) -> None:
+        """
+        Partitions the data by ticker once. Rows are sorted by ticker and year so
+        each company occupies a contiguous block, and `self._slices` maps every
+        ticker to its row range. Per-ticker work then slices the frame instead
+        of scanning it.
+        """
+        self.df, self.tickers, self._slices = partition_by_ticker(self.df)
+        self._history_values = self.df[self.features_for_history].to_numpy(dtype=float)
+
+    def get_company_data(self, ticker: str) -> pd.DataFrame:
+        """Returns the year-ordered rows for a ticker as a slice of the panel."""
+        rows = self._slices.get(ticker)
+        if rows is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[rows]
 
-    def _get_historical_data(self, company_df: pd.DataFrame) -> Dict:
+    def _get_historical_data(self, ticker: str) -> Dict:
         """Pivots historical data for the last 4 years into columns."""
         historical_data = {}
-        company_df = company_df.sort_values(by='Year').tail(4)
-        
-        for feature in self.features_for_history:
-            values = company_df[feature].tolist()
-            padded_values = np.pad(values, (4 - len(values), 0), 'constant', constant_values=np.nan)
-            for i, value in enumerate(padded_values, 1):
-                historical_data[f'{feature} Y{i}'] = value
+        rows = self._slices[ticker]
+        values = self._history_values[max(rows.start, rows.stop - 4):rows.stop]
+        padding = 4 - len(values)
+
+        for j, feature in enumerate(self.features_for_history):
+            for i in range(4):
+                historical_data[f'{feature} Y{i + 1}'] = values[i - padding, j] if i >= padding else np.nan
         return historical_data
 
     def analyze_company(self, ticker: str) -> Optional[Dict]:
         """Runs the full analysis for a single company."""
-        company_df = self.df[self.df['Ticker Symbol'] == ticker]
+        company_df = self.get_company_data(ticker)
         if company_df.empty:
             return None
 
@@ -69,7 +104,7 @@ class CompanyAnalyzer:
         
         anomaly_result = self.anomaly_detector.detect_company_anomalies(company_df, ticker)
         forecast_result = self.forecaster.forecast_company_metrics(company_df, ticker)
-        historical_data = self._get_historical_data(company_df)
+        historical_data = self._get_historical_data(ticker)
 
         combined_record = {
             'Ticker Symbol': ticker,
@@ -82,7 +117,7 @@ class CompanyAnalyzer:
 
     def run_full_analysis(self) -> pd.DataFrame:
         """Runs the combined analysis for all companies and returns a DataFrame."""
-        all_tickers = self.df['Ticker Symbol'].unique()
+        all_tickers = self.tickers
         all_results = []
         logger.info(f"Starting combined analysis for {len(all_tickers)} companies.")
         for ticker in all_tickers:
@@ -117,19 +152,44 @@ class FinancialAnomalyDetector:
         X_scaled = scaler.fit_transform(features_to_scale)
         iso_forest = IsolationForest(contamination='auto', random_state=42)
         
-        company_df_copy = company_df.copy()
-        company_df_copy['is_anomaly'] = (iso_forest.fit_predict(X_scaled) == -1).astype(int)
-        num_anomalies = company_df_copy['is_anomaly'].sum()
+        num_anomalies = int((iso_forest.fit_predict(X_scaled) == -1).sum())
         return {'Ticker Symbol': ticker, 'Number of Anomalies': num_anomalies}
 
 
 # --- Forecasting Class ---
 class FinancialForecaster:
-    """Forecasts financial metrics using ARIMA models."""
-    def __init__(self, order: Tuple[int, int, int] = (1, 1, 1)):
+    """
+    Forecasts financial metrics one year ahead.
+
+    Backends:
+      - 'arima': ARIMA model with the given order (default)
+      - 'drift': last value plus the average year-over-year change
+      - 'naive': last observed value
+    """
+    # Minimum number of observations each backend needs to produce a forecast
+    MIN_HISTORY = {'arima': 3, 'drift': 2, 'naive': 1}
+    BACKENDS = tuple(MIN_HISTORY)
+
+    def __init__(self, order: Tuple[int, int, int] = (1, 1, 1), backend: str = 'arima'):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown forecasting backend '{backend}'. Expected one of {self.BACKENDS}.")
         self.order = order
+        self.backend = backend
+        self.min_history = self.MIN_HISTORY[backend]
         self.features_to_forecast = ['Total Revenue', 'Net Income', 'Total Assets', 'Earnings Per Share']
 
+    def forecast_series(self, values: np.ndarray) -> float:
+        """Forecasts the next value of a series, or NaN if the history is too short."""
+        values = np.asarray(values, dtype=float)
+        if len(values) < self.min_history:
+            return np.nan
+        if self.backend == 'naive':
+            return float(values[-1])
+        if self.backend == 'drift':
+            return float(values[-1] + (values[-1] - values[0]) / (len(values) - 1))
+        model = ARIMA(values, order=self.order).fit()
+        return float(model.forecast(steps=1)[0])
+
     def forecast_company_metrics(self, company_df: pd.DataFrame, ticker: str) -> Dict:
         """Forecasts financial metrics for a single company."""
         prediction = {'Ticker Symbol': ticker}
@@ -138,13 +198,8 @@ class FinancialForecaster:
                 prediction[f'Predicted {feature}'] = np.nan
                 continue
             try:
-                time_series = company_df[feature].dropna()
-                if len(time_series) >= 3:
-                    model = ARIMA(time_series, order=self.order).fit()
-                    forecast = model.forecast(steps=1).iloc[0]
-                    prediction[f'Predicted {feature}'] = forecast
-                else:
-                    prediction[f'Predicted {feature}'] = np.nan
+                time_series = company_df[feature].dropna().to_numpy()
+                prediction[f'Predicted {feature}'] = self.forecast_series(time_series)
             except Exception as e:
                 logger.warning(f"Could not generate forecast for {ticker} - {feature}: {e}")
                 prediction[f'Predicted {feature}'] = np.nan
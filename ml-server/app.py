@@ -5,6 +5,8 @@ import numpy as np
 from anomalynforecaster import CompanyAnalyzer
 from data_preprocessor import FinancialDataPreprocessor
 from generate_summary import generate_company_summary
+from lazy_analysis import LazyAnalysisReport
+from peer_rankings import PeerRankings
 import logging
 import os
 
@@ -13,11 +15,94 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+# Enable CORS for all routes; expose the analysis progress headers to browsers
+CORS(app, expose_headers=['X-Analysis-Completed', 'X-Analysis-Total', 'X-Analysis-Complete'])
+
+# Analysis mode: 'eager' runs the full analysis before serving, 'lazy' analyzes
+# each ticker on first request and fills in the rest of the report in the background
+ANALYSIS_MODE = os.getenv('ANALYSIS_MODE', 'eager').lower()
 
 # Global variables to store processed data
 processed_data = None
 analysis_results = None
+lazy_report = None
+peer_rankings = None
+
+def save_analysis_report(report_df):
+    """Persists a completed lazy report so the next startup can load it directly"""
+    global analysis_results
+    report_df.to_csv('combined_financial_analysis_report.csv', index=False)
+    analysis_results = report_df
+    logger.info(f"Saved combined financial analysis report for {len(report_df)} companies")
+
+def run_analysis():
+    """Runs the analysis according to ANALYSIS_MODE"""
+    global analysis_results, lazy_report
+    analyzer = CompanyAnalyzer('preprocessed_data.csv')
+    if ANALYSIS_MODE == 'lazy':
+        lazy_report = LazyAnalysisReport(analyzer, on_complete=save_analysis_report)
+        lazy_report.start_background_fill()
+        logger.info(f"Lazy analysis enabled for {len(lazy_report.tickers)} companies")
+    else:
+        analysis_results = analyzer.run_full_analysis()
+        logger.info(f"Analysis completed for {len(analysis_results)} companies")
+
+def refresh_peer_rankings():
+    """Recomputes peer percentile ranks from cleaned, unimputed fundamentals"""
+    global peer_rankings
+    # Imputed medians and zero fills in processed_data must not be ranked as
+    # real observations, so rank from the raw data after cleaning only
+    preprocessor = FinancialDataPreprocessor()
+    if not preprocessor.load_data('fundamentals.csv'):
+        logger.error("Peer rankings unavailable: could not load fundamentals.csv")
+        peer_rankings = None
+        return
+    preprocessor.clean_data()
+    peer_rankings = PeerRankings(preprocessor.get_preprocessed_data())
+
+def analysis_ready():
+    """True once analysis results can be served, either complete or lazily"""
+    return analysis_results is not None or lazy_report is not None
+
+def get_analysis_results():
+    """Returns the report DataFrame, which may be partial in lazy mode"""
+    if analysis_results is not None:
+        return analysis_results
+    return lazy_report.to_dataframe()
+
+def get_company_analysis(ticker):
+    """Returns the analysis row for a ticker, analyzing it on demand in lazy mode"""
+    if analysis_results is not None:
+        company_analysis = analysis_results[analysis_results['Ticker Symbol'] == ticker]
+        return None if company_analysis.empty else company_analysis.iloc[0]
+    record = lazy_report.get_company_analysis(ticker)
+    return None if record is None else pd.Series(record)
+
+def get_listed_analysis_rows():
+    """
+    Yields (ticker, analysis row or None) for every company that can be requested.
+    In lazy mode this covers all analyzable tickers; unanalyzed ones yield None.
+    """
+    report = get_analysis_results()
+    if analysis_results is not None:
+        for _, analysis_row in report.iterrows():
+            yield analysis_row['Ticker Symbol'], analysis_row
+        return
+    rows = {} if report.empty else {row['Ticker Symbol']: row for _, row in report.iterrows()}
+    for ticker in lazy_report.tickers:
+        yield ticker, rows.get(ticker)
+
+def get_analysis_progress():
+    """Returns how much of the analysis report is complete"""
+    if analysis_results is not None:
+        total = len(analysis_results)
+        return {
+            'completedCompanies': total,
+            'totalCompanies': total,
+            'percentComplete': 100.0,
+            'isComplete': True
+        }
+    return lazy_report.progress_info()
 
 def initialize_data():
     """Initialize data processing and analysis on startup"""
@@ -43,11 +128,8 @@ def initialize_data():
         preprocessed_path = 'preprocessed_data.csv'
         
         if not os.path.exists(combined_report_path):
-            logger.info("Combined financial analysis report not found. Running full analysis...")
-            # Run analysis
-            analyzer = CompanyAnalyzer('preprocessed_data.csv')
-            analysis_results = analyzer.run_full_analysis()
-            logger.info(f"Analysis completed for {len(analysis_results)} companies")
+            logger.info("Combined financial analysis report not found. Running analysis...")
+            run_analysis()
         else:
             # Check if the combined report is newer than the preprocessed data
             combined_report_time = os.path.getmtime(combined_report_path)
@@ -55,16 +137,16 @@ def initialize_data():
             
             if combined_report_time < preprocessed_time:
                 logger.info("Combined financial analysis report is outdated. Running fresh analysis...")
-                # Run analysis
-                analyzer = CompanyAnalyzer('preprocessed_data.csv')
-                analysis_results = analyzer.run_full_analysis()
-                logger.info(f"Analysis completed for {len(analysis_results)} companies")
+                run_analysis()
             else:
                 logger.info("Combined financial analysis report is up-to-date. Loading existing data...")
                 # Load existing analysis results
                 analysis_results = pd.read_csv(combined_report_path)
                 logger.info(f"Loaded existing analysis results for {len(analysis_results)} companies")
         
+        # Peer ranks are rebuilt together with the analysis snapshot
+        refresh_peer_rankings()
+        
         return True
         
     except Exception as e:
@@ -77,20 +159,20 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'data_loaded': processed_data is not None,
-        'analysis_complete': analysis_results is not None
+        'analysis_complete': analysis_ready() and get_analysis_progress()['isComplete']
     })
 
 @app.route('/api/companies', methods=['GET'])
 def get_companies():
     """Get list of companies that exist in the combined financial analysis report"""
-    if processed_data is None or analysis_results is None:
+    if processed_data is None or not analysis_ready():
         return jsonify({'error': 'Data not initialized'}), 500
     
     try:
         companies = []
-        # Only include companies that exist in the analysis results (combined report)
-        for _, analysis_row in analysis_results.iterrows():
-            ticker = analysis_row['Ticker Symbol']
+        # Only include companies that exist in the analysis results (combined report),
+        # or in lazy mode every company that can still be analyzed on request
+        for ticker, analysis_row in get_listed_analysis_rows():
             
             # Get company data from processed data
             company_data = processed_data[processed_data['Ticker Symbol'] == ticker]
@@ -100,14 +182,16 @@ def get_companies():
                 latest_year = company_data['Year'].max()
                 latest_data = company_data[company_data['Year'] == latest_year].iloc[0]
                 
-                # Get anomaly count from analysis results
-                anomaly_count = analysis_row['Number of Anomalies']
+                # Get anomaly count from analysis results; None until a lazy analysis runs
+                pending = analysis_row is None
+                anomaly_count = None if pending else int(analysis_row['Number of Anomalies'])
                 
                 company_info = {
                     'id': ticker.lower(),
                     'name': ticker,
                     'ticker': ticker,
-                    'anomalyCount': int(anomaly_count),
+                    'anomalyCount': anomaly_count,
+                    'pending': pending,
                     'latestYear': int(latest_year),
                     'totalRevenue': float(latest_data['Total Revenue']) if pd.notna(latest_data['Total Revenue']) else 0,
                     'netIncome': float(latest_data['Net Income']) if pd.notna(latest_data['Net Income']) else 0,
@@ -126,7 +210,7 @@ def get_companies():
 @app.route('/api/company/<ticker>', methods=['GET'])
 def get_company_details(ticker):
     """Get detailed analysis for a specific company"""
-    if processed_data is None or analysis_results is None:
+    if processed_data is None or not analysis_ready():
         return jsonify({'error': 'Data not initialized'}), 500
     
     try:
@@ -137,13 +221,11 @@ def get_company_details(ticker):
             return jsonify({'error': 'Company not found'}), 404
         
         # Get analysis results
-        company_analysis = analysis_results[analysis_results['Ticker Symbol'] == ticker]
+        analysis = get_company_analysis(ticker)
         
-        if company_analysis.empty:
+        if analysis is None:
             return jsonify({'error': 'Analysis not available for this company'}), 404
         
-        analysis = company_analysis.iloc[0]
-        
         # Prepare historical data for charts
         company_data = company_data.sort_values('Year')
         
@@ -236,15 +318,44 @@ def get_company_details(ticker):
         logger.error(f"Error getting company details for {ticker}: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/company/<ticker>/peers', methods=['GET'])
+def get_company_peers(ticker):
+    """Get percentile ranks of a company's key metrics among all companies per year"""
+    if peer_rankings is None:
+        return jsonify({'error': 'Data not initialized'}), 500
+    
+    try:
+        ticker = ticker.upper()
+        year = request.args.get('year')
+        if year is not None:
+            try:
+                year = int(year)
+            except ValueError:
+                return jsonify({'error': f"Invalid year '{year}'"}), 400
+        rankings = peer_rankings.get_company_rankings(ticker, year)
+        
+        if rankings is None:
+            return jsonify({'error': 'Peer rankings not available for this company'}), 404
+        
+        return jsonify({
+            'ticker': ticker,
+            'metrics': peer_rankings.metrics,
+            'rankings': {str(y): metrics for y, metrics in rankings.items()}
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting peer rankings for {ticker}: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/anomalies', methods=['GET'])
 def get_anomalies():
     """Get anomaly detection results for all companies"""
-    if analysis_results is None:
+    if not analysis_ready():
         return jsonify({'error': 'Analysis not initialized'}), 500
     
     try:
         anomalies = []
-        for _, row in analysis_results.iterrows():
+        for _, row in get_analysis_results().iterrows():
             anomaly_info = {
                 'id': row['Ticker Symbol'].lower(),
                 'name': row['Ticker Symbol'],
@@ -256,7 +367,13 @@ def get_anomalies():
         # Sort by anomaly count (descending)
         anomalies.sort(key=lambda x: x['anomalyCount'], reverse=True)
         
-        return jsonify(anomalies)
+        # Report completeness in headers so the response body stays a plain list
+        progress = get_analysis_progress()
+        response = jsonify(anomalies)
+        response.headers['X-Analysis-Completed'] = str(progress['completedCompanies'])
+        response.headers['X-Analysis-Total'] = str(progress['totalCompanies'])
+        response.headers['X-Analysis-Complete'] = 'true' if progress['isComplete'] else 'false'
+        return response
         
     except Exception as e:
         logger.error(f"Error getting anomalies: {e}")
@@ -265,12 +382,13 @@ def get_anomalies():
 @app.route('/api/summary', methods=['GET'])
 def get_summary():
     """Get overall summary statistics"""
-    if processed_data is None or analysis_results is None:
+    if processed_data is None or not analysis_ready():
         return jsonify({'error': 'Data not initialized'}), 500
     
     try:
         total_companies = len(processed_data['Ticker Symbol'].unique())
-        total_anomalies = analysis_results['Number of Anomalies'].sum()
+        report = get_analysis_results()
+        total_anomalies = report['Number of Anomalies'].sum() if not report.empty else 0
         avg_anomalies = total_anomalies / total_companies if total_companies > 0 else 0
         
         summary = {
@@ -280,7 +398,8 @@ def get_summary():
             'dataYearRange': {
                 'start': int(processed_data['Year'].min()),
                 'end': int(processed_data['Year'].max())
-            }
+            },
+            'analysisProgress': get_analysis_progress()
         }
         
         return jsonify(summary)
@@ -296,13 +415,15 @@ def get_company_summary(ticker):
         ticker = ticker.upper()
         
         # Check if company exists in analysis results
-        company_exists = analysis_results[analysis_results['Ticker Symbol'] == ticker]
-        if company_exists.empty:
+        if not analysis_ready():
+            return jsonify({'error': 'Analysis not initialized'}), 500
+        analysis = get_company_analysis(ticker)
+        if analysis is None:
             return jsonify({'error': 'Company not found'}), 404
         
-        # Generate AI summary
+        # Generate AI summary from the same record served by /api/company/<ticker>
         logger.info(f"Generating AI summary for {ticker}")
-        summary_text = generate_company_summary(ticker)
+        summary_text = generate_company_summary(ticker, company_row=analysis)
         
         if summary_text.startswith('Error:'):
             return jsonify({'error': summary_text}), 500
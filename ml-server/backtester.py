@@ -0,0 +1,196 @@
+"""
+Forecast Backtesting Module for Insight AI
+Evaluates one-step-ahead forecasts of FinancialForecaster against history.
+For every ticker it builds expanding or sliding training windows over runs of
+consecutive years, forecasts the following year for each window in a process
+pool, and reports MAPE/RMSE per feature and per forecasting backend. All
+backends are scored on the same (ticker, target year) pairs.
+"""
+
+import pandas as pd
+import numpy as np
+import argparse
+import logging
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from anomalynforecaster import FinancialForecaster, partition_by_ticker
+from data_preprocessor import FinancialDataPreprocessor
+
+# Configure logging
+warnings.filterwarnings('ignore')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def generate_windows(values: np.ndarray, mode: str = 'expanding', window_size: int = 3,
+                     min_train: int = 1) -> List[Tuple[np.ndarray, int]]:
+    """
+    Returns (training window, target row index) pairs for a (year x feature) array.
+
+    'expanding' windows are prefixes values[:k]; 'sliding' windows have a fixed
+    length of `window_size` and come from `sliding_window_view`. Both are views
+    into `values`, so no training data is copied.
+    """
+    n_years = len(values)
+    if mode == 'expanding':
+        return [(values[:k], k) for k in range(max(min_train, 1), n_years)]
+    if mode == 'sliding':
+        if n_years <= window_size:
+            return []
+        # Shape (n_windows, n_features, window_size); drop the last window, which has no target
+        views = sliding_window_view(values, window_size, axis=0)[:-1]
+        return [(views[i].T, i + window_size) for i in range(len(views))]
+    raise ValueError(f"Unknown window mode '{mode}'. Expected 'expanding' or 'sliding'.")
+
+
+def split_contiguous_years(values: np.ndarray, years: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Splits a year-sorted (year x feature) array into views covering consecutive years."""
+    breaks = np.flatnonzero(np.diff(years) != 1) + 1
+    return list(zip(np.split(values, breaks), np.split(years, breaks)))
+
+
+def _backtest_ticker(task: Tuple) -> List[Dict]:
+    """Runs every backend over every window of one ticker. Executed in a worker process."""
+    ticker, values, years, features, backends, mode, window_size = task
+    forecasters = [FinancialForecaster(backend=backend) for backend in backends]
+    # Every backend must be able to forecast every window, so all are scored on the same targets
+    min_train = max(forecaster.min_history for forecaster in forecasters)
+    rows = []
+    for run_values, run_years in split_contiguous_years(values, years):
+        for train, target_index in generate_windows(run_values, mode, window_size, min_train):
+            target = run_values[target_index]
+            target_year = int(run_years[target_index])
+            for j, feature in enumerate(features):
+                actual = target[j]
+                history = train[:, j]
+                history = history[~np.isnan(history)]
+                if np.isnan(actual) or len(history) < min_train:
+                    continue
+                for forecaster in forecasters:
+                    start = time.perf_counter()
+                    try:
+                        predicted = forecaster.forecast_series(history)
+                    except Exception:
+                        predicted = np.nan
+                    elapsed = time.perf_counter() - start
+                    rows.append({
+                        'Ticker Symbol': ticker,
+                        'Backend': forecaster.backend,
+                        'Feature': feature,
+                        'Target Year': target_year,
+                        'Train Years': len(train),
+                        'Actual': actual,
+                        'Predicted': predicted,
+                        'Seconds': elapsed
+                    })
+    return rows
+
+
+class ForecastBacktester:
+    """Backtests FinancialForecaster backends on rolling windows of historical data."""
+
+    def __init__(self, df: pd.DataFrame, backends: Sequence[str] = FinancialForecaster.BACKENDS,
+                 mode: str = 'expanding', window_size: int = 3, max_workers: Optional[int] = None):
+        unknown = [b for b in backends if b not in FinancialForecaster.BACKENDS]
+        if unknown:
+            raise ValueError(f"Unknown forecasting backends {unknown}. Expected any of {FinancialForecaster.BACKENDS}.")
+        if mode not in ('expanding', 'sliding'):
+            raise ValueError(f"Unknown window mode '{mode}'. Expected 'expanding' or 'sliding'.")
+        min_train = max(FinancialForecaster.MIN_HISTORY[b] for b in backends)
+        if mode == 'sliding' and window_size < min_train:
+            raise ValueError(f"Sliding window size {window_size} is smaller than the {min_train} years "
+                             f"required by the selected backends {list(backends)}.")
+        self.backends = list(backends)
+        self.mode = mode
+        self.window_size = window_size
+        self.max_workers = max_workers
+        self.features = FinancialForecaster().features_to_forecast
+
+        # One observation per company and year; keep the last filing if a year repeats
+        duplicates = df.duplicated(subset=['Ticker Symbol', 'Year'], keep='last')
+        if duplicates.any():
+            logger.info(f"Dropping {int(duplicates.sum())} duplicate ticker-year rows.")
+        self.df, self.tickers, self._slices = partition_by_ticker(df[~duplicates])
+        self._values = self.df[self.features].to_numpy(dtype=float)
+        self._years = self.df['Year'].to_numpy(dtype=int)
+
+    def run(self) -> pd.DataFrame:
+        """Forecasts every window of every ticker and returns one row per forecast."""
+        tasks = [
+            (ticker, self._values[self._slices[ticker]], self._years[self._slices[ticker]],
+             self.features, self.backends, self.mode, self.window_size)
+            for ticker in self.tickers
+        ]
+        logger.info(f"Backtesting {len(self.backends)} backends on {len(tasks)} companies ({self.mode} windows).")
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(_backtest_ticker, tasks, chunksize=max(1, len(tasks) // 64))
+            rows = [row for ticker_rows in results for row in ticker_rows]
+        logger.info(f"Backtesting produced {len(rows)} forecasts.")
+        if not rows:
+            logger.warning("No company has enough consecutive years in the selected range to backtest.")
+        return pd.DataFrame(rows, columns=[
+            'Ticker Symbol', 'Backend', 'Feature', 'Target Year', 'Train Years', 'Actual', 'Predicted', 'Seconds'
+        ])
+
+    @staticmethod
+    def summarize(forecasts: pd.DataFrame) -> pd.DataFrame:
+        """Aggregates forecasts into MAPE, RMSE and timing per backend and feature."""
+        def score(group: pd.DataFrame) -> pd.Series:
+            valid = group.dropna(subset=['Predicted'])
+            errors = valid['Predicted'] - valid['Actual']
+            nonzero = valid['Actual'] != 0
+            return pd.Series({
+                'Windows': len(group),
+                'Failed Forecasts': len(group) - len(valid),
+                'MAPE': (errors[nonzero].abs() / valid.loc[nonzero, 'Actual'].abs()).mean() * 100,
+                'RMSE': np.sqrt((errors ** 2).mean()),
+                'Mean Seconds per Forecast': group['Seconds'].mean()
+            })
+
+        summary_columns = ['Backend', 'Feature', 'Windows', 'Failed Forecasts', 'MAPE', 'RMSE', 'Mean Seconds per Forecast']
+        if forecasts.empty:
+            return pd.DataFrame(columns=summary_columns)
+
+        summary = forecasts.groupby(['Backend', 'Feature'])[['Actual', 'Predicted', 'Seconds']].apply(score)
+        summary[['Windows', 'Failed Forecasts']] = summary[['Windows', 'Failed Forecasts']].astype(int)
+        return summary.reset_index()
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Backtest FinancialForecaster backends on historical data.')
+    parser.add_argument('--input', default='fundamentals.csv', help='Raw fundamentals CSV')
+    parser.add_argument('--start-year', type=int, default=None, help='First fiscal year to include')
+    parser.add_argument('--end-year', type=int, default=None, help='Last fiscal year to include')
+    parser.add_argument('--mode', choices=['expanding', 'sliding'], default='expanding')
+    parser.add_argument('--window-size', type=int, default=3, help='Training years per sliding window')
+    parser.add_argument('--backends', nargs='+', default=list(FinancialForecaster.BACKENDS),
+                        choices=FinancialForecaster.BACKENDS)
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--output', default='forecast_backtest_report.csv')
+    args = parser.parse_args()
+
+    # Only load and clean: imputation would fill gaps with medians taken over
+    # future years, so missing values stay NaN and are skipped by the backtest
+    preprocessor = FinancialDataPreprocessor(start_year=args.start_year, end_year=args.end_year)
+    if not preprocessor.load_data(args.input):
+        logger.error("🔥 Loading data failed!")
+        raise SystemExit(1)
+    preprocessor.clean_data()
+
+    try:
+        backtester = ForecastBacktester(
+            preprocessor.get_preprocessed_data(), backends=args.backends, mode=args.mode,
+            window_size=args.window_size, max_workers=args.workers
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    report_df = ForecastBacktester.summarize(backtester.run())
+    report_df.to_csv(args.output, index=False)
+    logger.info(f"✅ Backtest complete. Report saved to '{args.output}'")
+    print(f"\n--- Backtest Report ---\n")
+    print(report_df.to_string(index=False))
@@ -17,8 +17,14 @@ logger = logging.getLogger(__name__)
 class FinancialDataPreprocessor:
     """Handles preprocessing of financial data for ML analysis"""
 
-    def __init__(self):
+    def __init__(self, start_year: Optional[int] = 2012, end_year: Optional[int] = 2015):
+        """
+        Fiscal years outside [start_year, end_year] are dropped during cleaning.
+        Pass None for either bound to keep all years on that side.
+        """
         self.df = None
+        self.start_year = start_year
+        self.end_year = end_year
         self.columns_to_keep = [
             'Ticker Symbol', 'Period Ending', 'Accounts Payable', 'Accounts Receivable',
             'Capital Expenditures', 'Cash and Cash Equivalents', 'Cost of Revenue',
@@ -56,7 +62,10 @@ class FinancialDataPreprocessor:
         self.df = self.df[self.columns_to_keep]
         self.df['Period Ending'] = pd.to_datetime(self.df['Period Ending'])
         self.df['Year'] = self.df['Period Ending'].dt.year
-        self.df = self.df[self.df['Year'].between(2012, 2015)]
+        if self.start_year is not None:
+            self.df = self.df[self.df['Year'] >= self.start_year]
+        if self.end_year is not None:
+            self.df = self.df[self.df['Year'] <= self.end_year]
         self.df = self.df.sort_values(by=['Ticker Symbol', 'Year'])
         logger.info("Data cleaning completed.")
 
@@ -3,15 +3,18 @@ import pandas as pd
 from dotenv import load_dotenv
 import google.generativeai as genai
 import logging
+from typing import Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def generate_company_summary(ticker_symbol: str) -> str:
+def generate_company_summary(ticker_symbol: str, company_row: Optional[pd.Series] = None) -> str:
     """
     Generates a detailed financial summary for a given company by reading from the
     combined analysis report, powered by the Gemini API.
+    If `company_row` is given (e.g. the in-memory analysis record), it is used
+    instead of reading the report CSV from disk.
     Returns the generated text (or an error string).
     """
     # 1. Load env and configure API
@@ -25,25 +28,26 @@ def generate_company_summary(ticker_symbol: str) -> str:
     model = genai.GenerativeModel('gemini-1.5-flash')
     generation_config = genai.types.GenerationConfig(max_output_tokens=2048)
 
-    # 2. Load the SINGLE combined analysis report CSV
-    try:
-        report_path = 'combined_financial_analysis_report.csv'
-        logger.info(f"Loading combined analysis report from: {report_path}")
-        combined_df = pd.read_csv(report_path)
-    except FileNotFoundError:
-        error_msg = f"Error: The file '{report_path}' was not found. Please run the main analysis script first."
-        logger.error(error_msg)
-        return error_msg
-
-    # 3. Gather all required data from the single row for the company
-    company_data = combined_df[combined_df['Ticker Symbol'] == ticker_symbol]
-    
-    if company_data.empty:
-        error_msg = f"Error: No data found for ticker '{ticker_symbol}' in the report."
-        logger.error(error_msg)
-        return error_msg
+    if company_row is None:
+        # 2. Load the SINGLE combined analysis report CSV
+        try:
+            report_path = 'combined_financial_analysis_report.csv'
+            logger.info(f"Loading combined analysis report from: {report_path}")
+            combined_df = pd.read_csv(report_path)
+        except FileNotFoundError:
+            error_msg = f"Error: The file '{report_path}' was not found. Please run the main analysis script first."
+            logger.error(error_msg)
+            return error_msg
+
+        # 3. Gather all required data from the single row for the company
+        company_data = combined_df[combined_df['Ticker Symbol'] == ticker_symbol]
         
-    company_row = company_data.iloc[0]
+        if company_data.empty:
+            error_msg = f"Error: No data found for ticker '{ticker_symbol}' in the report."
+            logger.error(error_msg)
+            return error_msg
+            
+        company_row = company_data.iloc[0]
 
     anomaly_info = f"Detected {int(company_row['Number of Anomalies'])} anomaly/anomalies in recent years."
 
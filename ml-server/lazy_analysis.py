@@ -0,0 +1,176 @@
+"""
+Lazy Analysis Module for Insight AI
+Serves per-ticker analysis on demand instead of waiting for the full report.
+Results are memoized in the report itself while a low-priority background
+thread fills in the remaining tickers.
+"""
+
+import pandas as pd
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+
+from anomalynforecaster import CompanyAnalyzer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class LazyAnalysisReport:
+    """
+    Builds the combined analysis report one ticker at a time.
+
+    Foreground requests go through `get_company_analysis`, which runs
+    `CompanyAnalyzer.analyze_company` the first time a ticker is requested.
+    Finished records are the rows of the report, so `_records` doubles as the
+    memo: no ticker is analyzed twice, and memory is bounded by the number of
+    tickers, the same as a fully built report.
+    """
+
+    def __init__(self, analyzer: CompanyAnalyzer, idle_delay: float = 0.05,
+                 on_complete: Optional[Callable[[pd.DataFrame], None]] = None):
+        self.analyzer = analyzer
+        self.idle_delay = idle_delay
+        self.on_complete = on_complete
+        self.tickers: List[str] = list(analyzer.tickers)
+        self._ticker_set = set(self.tickers)
+
+        self._records: Dict[str, Dict] = {}
+        self._snapshot: Optional[pd.DataFrame] = None
+
+        # One lock guards the bookkeeping, another serializes model fitting so
+        # the background thread and request handlers never analyze in parallel.
+        self._lock = threading.Lock()
+        self._analysis_lock = threading.Lock()
+        self._pending_requests = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._report_finished = False
+
+    # --- Foreground access ---
+    def get_company_analysis(self, ticker: str) -> Optional[Dict]:
+        """Returns the analysis record for a ticker, computing it on first use."""
+        if ticker not in self._ticker_set:
+            return None
+
+        with self._lock:
+            record = self._records.get(ticker)
+            if record is not None:
+                return record
+            self._pending_requests += 1
+            self._idle.clear()
+
+        try:
+            record = self._analyze(ticker)
+        finally:
+            with self._lock:
+                self._pending_requests -= 1
+                if self._pending_requests == 0:
+                    self._idle.set()
+        # A ticker that failed in the background may be the last one missing
+        if record is not None and self._worker is not None and not self._worker.is_alive():
+            self._finish_if_complete()
+        return record
+
+    def _analyze(self, ticker: str) -> Optional[Dict]:
+        """Runs the analyzer for a ticker unless another caller already finished it."""
+        with self._analysis_lock:
+            with self._lock:
+                record = self._records.get(ticker)
+            if record is None:
+                record = self.analyzer.analyze_company(ticker)
+                if record is None:
+                    return None
+
+        with self._lock:
+            if ticker not in self._records:
+                self._records[ticker] = record
+                self._snapshot = None
+        return record
+
+    # --- Background fill ---
+    def start_background_fill(self) -> None:
+        """Starts the daemon thread that analyzes the remaining tickers."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._fill_remaining, name='lazy-analysis-fill', daemon=True)
+        self._worker.start()
+
+    def stop_background_fill(self) -> None:
+        """Signals the background thread to stop after the current ticker."""
+        self._stop.set()
+        self._idle.set()
+
+    def _fill_remaining(self) -> None:
+        """Analyzes outstanding tickers, yielding to any in-flight foreground request."""
+        logger.info(f"Background analysis started for {len(self.tickers)} companies.")
+        for ticker in self.tickers:
+            if self._stop.is_set():
+                logger.info("Background analysis stopped.")
+                return
+            with self._lock:
+                done = ticker in self._records
+            if done:
+                continue
+            # Low priority: wait until no request is waiting on the analyzer,
+            # then leave a short gap so new requests can get in first.
+            self._idle.wait()
+            if self._stop.wait(self.idle_delay):
+                logger.info("Background analysis stopped.")
+                return
+            self._idle.wait()
+            try:
+                self._analyze(ticker)
+            except Exception as e:
+                logger.warning(f"Background analysis failed for {ticker}: {e}")
+        completed, total = self.progress()
+        logger.info(f"Background analysis finished: {completed}/{total} companies analyzed.")
+        if not self.is_complete():
+            with self._lock:
+                missing = [t for t in self.tickers if t not in self._records]
+            logger.warning(f"Report is incomplete; {len(missing)} companies will be analyzed on demand: {missing}")
+        self._finish_if_complete()
+
+    def _finish_if_complete(self) -> None:
+        """Hands the report to `on_complete` once, and only when every ticker has a record."""
+        with self._lock:
+            if self._report_finished or len(self._records) < len(self.tickers):
+                return
+            self._report_finished = True
+        if self.on_complete is not None:
+            try:
+                self.on_complete(self.to_dataframe())
+            except Exception as e:
+                logger.error(f"Error handling completed report: {e}")
+
+    # --- Report views ---
+    def progress(self) -> tuple:
+        """Returns (completed, total) ticker counts."""
+        with self._lock:
+            return len(self._records), len(self.tickers)
+
+    def is_complete(self) -> bool:
+        completed, total = self.progress()
+        return completed >= total
+
+    def progress_info(self) -> Dict:
+        """Returns report completeness in the shape used by the API responses."""
+        completed, total = self.progress()
+        return {
+            'completedCompanies': completed,
+            'totalCompanies': total,
+            'percentComplete': round(100.0 * completed / total, 2) if total > 0 else 100.0,
+            'isComplete': completed >= total
+        }
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Returns the finished part of the report, in analyzer ticker order."""
+        with self._lock:
+            if self._snapshot is None:
+                records = [self._records[t] for t in self.tickers if t in self._records]
+                self._snapshot = pd.DataFrame(records)
+            return self._snapshot
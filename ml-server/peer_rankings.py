@@ -0,0 +1,106 @@
+"""
+Peer Rankings Module for Insight AI
+Precomputes cross-sectional percentile ranks of key metrics for every year,
+so a company's standing among its peers can be served with a dict lookup.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class PeerRankings:
+    """
+    Ranks every company against all companies reporting in the same year.
+
+    Expects cleaned but unimputed data (`FinancialDataPreprocessor.load_data`
+    and `clean_data`), so a missing value is left out of the ranking instead of
+    being ranked as a filled-in median or 0. Return on Equity and
+    Revenue_Growth_Rate are derived here from the raw columns.
+
+    For each (year, metric) the peer values are sorted once and every
+    company's rank and percentile come from a searchsorted over that array.
+    The results are stored in a per-ticker payload that the API returns as-is.
+    """
+    METRICS = [
+        'Total Revenue', 'Net Income', 'Earnings Per Share', 'Return on Equity',
+        'Gross Margin', 'Operating Margin', 'Profit Margin', 'Revenue_Growth_Rate'
+    ]
+
+    def __init__(self, df: pd.DataFrame, metrics: Optional[List[str]] = None):
+        # One row per company and year; keep the last filing if a year repeats
+        df = df.drop_duplicates(subset=['Ticker Symbol', 'Year'], keep='last')
+        df = self._derive_metrics(df.sort_values(by=['Ticker Symbol', 'Year'], kind='stable'))
+        self.metrics = [m for m in (metrics or self.METRICS) if m in df.columns]
+        self._rankings: Dict[str, Dict[int, Dict[str, Dict]]] = {}
+        self._build(df)
+
+    @staticmethod
+    def _derive_metrics(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds Return on Equity and year-over-year revenue growth in percent.
+        Growth is NaN when the prior year is missing, and ratios with a zero
+        denominator are NaN instead of infinite.
+        """
+        df = df.copy()
+        if 'Net Income' in df.columns and 'Total Equity' in df.columns:
+            df['Return on Equity'] = df['Net Income'] / df['Total Equity']
+        if 'Total Revenue' in df.columns:
+            previous = df.groupby('Ticker Symbol')[['Year', 'Total Revenue']].shift(1)
+            has_prior_year = df['Year'] - previous['Year'] == 1
+            growth = (df['Total Revenue'] / previous['Total Revenue'] - 1) * 100
+            df['Revenue_Growth_Rate'] = growth.where(has_prior_year)
+        return df.replace([np.inf, -np.inf], np.nan)
+
+    def _build(self, df: pd.DataFrame) -> None:
+        """Sorts each year's peer values once and ranks every company against them."""
+        values = df[self.metrics].to_numpy(dtype=float)
+
+        tickers = df['Ticker Symbol'].to_numpy()
+        years = df['Year'].to_numpy().astype(int)
+        percentiles = np.full(values.shape, np.nan)
+        ranks = np.full(values.shape, np.nan)
+        counts = np.zeros(values.shape)
+
+        for year in np.unique(years):
+            rows = np.flatnonzero(years == year)
+            for j in range(len(self.metrics)):
+                year_values = values[rows, j]
+                sorted_values = np.sort(year_values[~np.isnan(year_values)])
+                if len(sorted_values) == 0:
+                    continue
+                # Peers with a value at or below each company's value
+                at_or_below = np.searchsorted(sorted_values, year_values, side='right')
+                # Percentile: share of peers at or below; rank: 1 is the highest value
+                percentiles[rows, j] = 100.0 * at_or_below / len(sorted_values)
+                ranks[rows, j] = len(sorted_values) - at_or_below + 1
+                counts[rows, j] = len(sorted_values)
+
+        for i, (ticker, year) in enumerate(zip(tickers, years)):
+            year_rankings = {}
+            for j, metric in enumerate(self.metrics):
+                if np.isnan(values[i, j]):
+                    continue
+                year_rankings[metric] = {
+                    'value': float(values[i, j]),
+                    'percentile': round(float(percentiles[i, j]), 2),
+                    'rank': int(ranks[i, j]),
+                    'peerCount': int(counts[i, j])
+                }
+            self._rankings.setdefault(ticker, {})[int(year)] = year_rankings
+
+        logger.info(f"Computed peer rankings for {len(self._rankings)} companies across {len(np.unique(years))} years.")
+
+    def get_company_rankings(self, ticker: str, year: Optional[int] = None) -> Optional[Dict[int, Dict[str, Dict]]]:
+        """Returns {year: {metric: ranking}} for a ticker, optionally limited to one year."""
+        company_rankings = self._rankings.get(ticker)
+        if company_rankings is None:
+            return None
+        if year is None:
+            return company_rankings
+        return {year: company_rankings[year]} if year in company_rankings else None
@@ -14,7 +14,9 @@ const ML_SERVICE_URL = process.env.ML_SERVICE_URL || 'http://localhost:5000';
 
 // Middleware
 app.use(helmet());
-app.use(cors());
+app.use(cors({
+  exposedHeaders: ['X-Analysis-Completed', 'X-Analysis-Total', 'X-Analysis-Complete']
+}));
 app.use(morgan('combined'));
 app.use(express.json());
 app.use(express.static(path.join(__dirname, '../client/dist')));
@@ -66,6 +68,12 @@ app.get('/api/company/:ticker', async (req, res) => {
 app.get('/api/anomalies', async (req, res) => {
   try {
     const response = await axios.get(`${ML_SERVICE_URL}/api/anomalies`);
+    // Forward report completeness headers set by the ML service in lazy mode
+    ['x-analysis-completed', 'x-analysis-total', 'x-analysis-complete'].forEach((header) => {
+      if (response.headers[header] !== undefined) {
+        res.set(header, response.headers[header]);
+      }
+    });
     res.json(response.data);
   } catch (error) {
     console.error('Error fetching anomalies:', error.message);
@@ -100,6 +108,25 @@ app.get('/api/company/:ticker/summary', async (req, res) => {
   }
 });
 
+app.get('/api/company/:ticker/peers', async (req, res) => {
+  try {
+    const { ticker } = req.params;
+    const response = await axios.get(`${ML_SERVICE_URL}/api/company/${ticker}/peers`, { params: req.query });
+    res.json(response.data);
+  } catch (error) {
+    console.error(`Error fetching peer rankings for ${req.params.ticker}:`, error.message);
+    // Pass validation (400) and not-found (404) responses from the ML service through unchanged
+    if (error.response?.status === 400 || error.response?.status === 404) {
+      res.status(error.response.status).json(error.response.data);
+    } else {
+      res.status(500).json({
+        error: 'Failed to fetch peer rankings',
+        details: error.message
+      });
+    }
+  }
+});
+
 // ML Service health check
 app.get('/api/ml-health', async (req, res) => {
   try {